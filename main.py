@@ -1,14 +1,19 @@
+import asyncio
 import os
-from typing import List, Optional, Dict, Any
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterator, List, Optional, Dict, Any, Sequence, Tuple
 
-from fastapi import FastAPI, HTTPException, Body
+import httpx
+import orjson
+from fastapi import FastAPI, HTTPException, Body, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv; load_dotenv()
 
 from services.github_client import GitHubClient
-from services.review_agent import ReviewEngine, ReviewFinding, ReviewResult
+from services.review_agent import ENGINE, ReviewEngine, ReviewFinding, ReviewResult
 
 
 class ReviewRequest(BaseModel):
@@ -24,9 +29,50 @@ class ReviewRequest(BaseModel):
         default=None,
         description="If contains 'explain issues in plain English', NL mode is enabled",
     )
+    stream: bool = Field(
+        default=False,
+        description="If true, streams NDJSON: one line of comments per file as it is reviewed, then the summary",
+    )
+
+
+# Finished reviews keyed by (owner, repo, pr_number, head_sha). A push changes the
+# head SHA, so stale entries are never hit; they just age out of the LRU. Findings
+# are kept per file (in PR file order) so files without findings replay too.
+ReviewKey = Tuple[str, str, int, str]
+FileFindings = Tuple[str, Tuple[ReviewFinding, ...]]
+CachedReview = Tuple[Tuple[FileFindings, ...], ReviewResult]
+_REVIEW_CACHE: "OrderedDict[ReviewKey, CachedReview]" = OrderedDict()
+_REVIEW_CACHE_SIZE = 512
+
+
+def _cache_get(key: ReviewKey) -> Optional[CachedReview]:
+    hit = _REVIEW_CACHE.get(key)
+    if hit is not None:
+        _REVIEW_CACHE.move_to_end(key)
+    return hit
+
+
+def _cache_put(key: ReviewKey, per_file: Sequence[FileFindings], result: ReviewResult) -> None:
+    _REVIEW_CACHE[key] = (tuple(per_file), result)
+    _REVIEW_CACHE.move_to_end(key)
+    if len(_REVIEW_CACHE) > _REVIEW_CACHE_SIZE:
+        _REVIEW_CACHE.popitem(last=False)
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP/2 client for the whole process: keep-alive connections to
+    # api.github.com are reused across reviews instead of re-handshaking each time.
+    async with httpx.AsyncClient(
+        http2=True, timeout=30.0, limits=httpx.Limits(max_keepalive_connections=20)
+    ) as http:
+        app.state.github = GitHubClient(client=http, token=os.getenv("GITHUB_TOKEN"))
+        yield
 
-app = FastAPI(title="PR Review Agent", version="1.1.0")
+
+app = FastAPI(
+    title="PR Review Agent", version="1.1.0", lifespan=lifespan, default_response_class=ORJSONResponse
+)
 
 
 # Root serves UI
@@ -44,66 +90,125 @@ async def healthz():
     return {"status": "ok"}
 
 
+def _review_file(engine: ReviewEngine, f: Dict[str, Any]) -> List[ReviewFinding]:
+    """Run the heuristics on a single PR file entry from the GitHub API."""
+    filename: str = f.get("filename", "")
+    patch: Optional[str] = f.get("patch")
+    if not patch:
+        return [
+            ReviewFinding(
+                file=filename,
+                line=None,
+                feedback="File changed but no textual patch available (binary/large file). Consider manual review.",
+                severity="info",
+                rule="no-text-diff",
+            )
+        ]
+    return engine.generate_feedback(diff_text=patch, file=filename)
+
+
+def _render_comments(findings: Sequence[ReviewFinding]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Build the `comments` and `inline_comments` payload lists for a batch of findings."""
+    comments: List[Dict[str, Any]] = []
+    inline_comments: List[Dict[str, Any]] = []
+    for f in findings:
+        comments.append({"file": f.file, "line": f.line, "feedback": f.feedback})
+        if f.line is not None:
+            inline_comments.append({"path": f.file, "side": "RIGHT", "line": f.line, "body": f.feedback})
+    return comments, inline_comments
+
+
+def _file_line(filename: str, findings: Sequence[ReviewFinding]) -> bytes:
+    comments, inline_comments = _render_comments(findings)
+    return orjson.dumps({"file": filename, "comments": comments, "inline_comments": inline_comments}) + b"\n"
+
+
+def _summary_line(result: ReviewResult, natural_lang: bool) -> bytes:
+    summary = result.summary_natural if natural_lang else result.summary
+    return orjson.dumps({"summary": summary, "score": result.score}) + b"\n"
+
+
+async def _stream_review(files: List[Dict[str, Any]], natural_lang: bool, key: ReviewKey) -> AsyncIterator[bytes]:
+    """Yield one NDJSON line per file as soon as its review finishes, then a summary line.
+
+    Per-file comment dicts are serialized and dropped right away, so only the
+    findings themselves are kept around for the final score (and the cache).
+    """
+    async def review(i: int, f: Dict[str, Any]) -> Tuple[int, str, List[ReviewFinding]]:
+        return i, f.get("filename", ""), await asyncio.to_thread(_review_file, ENGINE, f)
+
+    all_findings: List[ReviewFinding] = []
+    per_file: List[FileFindings] = [("", ())] * len(files)
+    for next_done in asyncio.as_completed([review(i, f) for i, f in enumerate(files)]):
+        i, filename, findings = await next_done
+        all_findings.extend(findings)
+        per_file[i] = (filename, tuple(findings))
+        yield _file_line(filename, findings)
+
+    result: ReviewResult = ENGINE.summarize_and_score(all_findings)
+    _cache_put(key, per_file, result)
+    yield _summary_line(result, natural_lang)
+
+
+def _stream_cached(per_file: Sequence[FileFindings], result: ReviewResult, natural_lang: bool) -> Iterator[bytes]:
+    """Replay a cached review in the same NDJSON shape as `_stream_review` (one line per file)."""
+    for filename, findings in per_file:
+        yield _file_line(filename, findings)
+    yield _summary_line(result, natural_lang)
+
+
 @app.post("/review", response_model=Dict[str, Any])
-async def review_endpoint(payload: ReviewRequest = Body(...)) -> Dict[str, Any]:
-    """Review a GitHub PR by number and return structured feedback."""
+async def review_endpoint(request: Request, payload: ReviewRequest = Body(...)):
+    """Review a GitHub PR by number and return structured feedback (or an NDJSON stream)."""
     natural_lang = payload.natural_language or (
         isinstance(payload.query, str)
         and "explain issues in plain english" in payload.query.lower()
     )
 
-    github_token = os.getenv("GITHUB_TOKEN")
-    client = GitHubClient(token=github_token)
+    client: GitHubClient = request.app.state.github
+    owner, repo, pr_number = payload.repo_owner, payload.repo_name, payload.pr_number
 
     try:
-        files = await client.fetch_pr_files(
-            owner=payload.repo_owner, repo=payload.repo_name, pr_number=payload.pr_number
-        )
+        head_sha = await client.fetch_pr_head_sha(owner=owner, repo=repo, pr_number=pr_number)
+        key: ReviewKey = (owner, repo, pr_number, head_sha)
+        cached = _cache_get(key)
+        if cached is None:
+            files = await client.fetch_pr_files(owner=owner, repo=repo, pr_number=pr_number)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"GitHub API error: {e}")
 
-    if not files:
+    if cached is not None:
+        per_file, result = cached
+        if payload.stream:
+            return StreamingResponse(_stream_cached(per_file, result, natural_lang), media_type="application/x-ndjson")
+        all_findings = [finding for _, findings in per_file for finding in findings]
+    elif not files:
+        summary, score = "No changed files found in this PR.", 100
+        if payload.stream:
+            # Same terminal record as every other stream: no file lines, just {summary, score}.
+            return StreamingResponse(
+                iter([orjson.dumps({"summary": summary, "score": score}) + b"\n"]), media_type="application/x-ndjson"
+            )
         return {
-            "summary": "No changed files found in this PR.",
-            "score": 100,
+            "summary": summary,
+            "score": score,
             "comments": [],
             "inline_comments": [],
         }
+    elif payload.stream:
+        return StreamingResponse(_stream_review(files, natural_lang, key), media_type="application/x-ndjson")
+    else:
+        reviewed = await asyncio.gather(*[asyncio.to_thread(_review_file, ENGINE, f) for f in files])
+        all_findings = [finding for findings in reviewed for finding in findings]
+        result = ENGINE.summarize_and_score(all_findings)
+        _cache_put(key, [(f.get("filename", ""), tuple(findings)) for f, findings in zip(files, reviewed)], result)
 
-    engine = ReviewEngine()
-    all_findings: List[ReviewFinding] = []
-
-    for f in files:
-        filename: str = f.get("filename", "")
-        patch: Optional[str] = f.get("patch")
-        if not patch:
-            all_findings.append(
-                ReviewFinding(
-                    file=filename,
-                    line=None,
-                    feedback="File changed but no textual patch available (binary/large file). Consider manual review.",
-                    severity="info",
-                    rule="no-text-diff",
-                )
-            )
-            continue
-
-        findings = engine.generate_feedback(diff_text=patch, file=filename)
-        all_findings.extend(findings)
-
-    result: ReviewResult = engine.summarize_and_score(all_findings)
+    comments, inline_comments = _render_comments(all_findings)
 
     response: Dict[str, Any] = {
         "summary": result.summary_natural if natural_lang else result.summary,
         "score": result.score,
-        "comments": [
-            {"file": f.file, "line": f.line, "feedback": f.feedback}
-            for f in all_findings
-        ],
-        "inline_comments": [
-            {"path": f.file, "side": "RIGHT", "line": f.line, "body": f.feedback}
-            for f in all_findings
-            if f.line is not None
-        ],
+        "comments": comments,
+        "inline_comments": inline_comments,
     }
     return response
@@ -1,25 +1,92 @@
+import asyncio
+from collections import OrderedDict
+
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 GITHUB_API = "https://api.github.com"
+PER_PAGE = 100  # GitHub maximum for /pulls/{n}/files (3000 files total)
+ETAG_CACHE_SIZE = 256  # cached PR metadata bodies kept for If-None-Match revalidation
 
 
 class GitHubClient:
-    """Lightweight GitHub REST client for PR files."""
+    """Lightweight GitHub REST client for PR files.
+
+    The underlying `httpx.AsyncClient` is owned by the caller so connections
+    (and TLS sessions) are reused across reviews. The small, frequently repeated
+    PR metadata lookup is revalidated with its ETag; a 304 reuses the cached body
+    and does not count against the primary rate limit. File pages (full patches)
+    are not cached: they are only fetched on a review-cache miss.
+    """
 
-    def __init__(self, token: Optional[str] = None):
+    def __init__(self, client: httpx.AsyncClient, token: Optional[str] = None):
+        self.client = client
         self.token = token
+        # url -> (etag, decoded body, parsed Link header)
+        self._etags: "OrderedDict[str, Tuple[str, Any, Dict[str, Dict[str, str]]]]" = OrderedDict()
 
-    async def fetch_pr_files(self, owner: str, repo: str, pr_number: int) -> List[Dict[str, Any]]:
-        url = f"{GITHUB_API}/repos/{owner}/{repo}/pulls/{pr_number}/files"
+    def _headers(self) -> Dict[str, str]:
         headers = {"Accept": "application/vnd.github+json"}
         if self.token:
             headers["Authorization"] = f"Bearer {self.token}"
             headers["X-GitHub-Api-Version"] = "2022-11-28"
+        return headers
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            r = await client.get(url, headers=headers)
+    async def _get_json(
+        self, url: str, params: Optional[Dict[str, Any]] = None, revalidate: bool = False
+    ) -> Tuple[Any, Dict[str, Dict[str, str]]]:
+        """GET returning (json body, Link header links).
+
+        With `revalidate=True` the body is kept in the ETag cache and later calls
+        send If-None-Match; only use it for small payloads.
+        """
+        headers = self._headers()
+        if not revalidate:
+            r = await self.client.get(url, headers=headers, params=params)
             r.raise_for_status()
-            data = r.json()
-            # data is a list of files with keys like filename, status, additions, deletions, patch, etc.
+            return r.json(), r.links
+
+        key = str(httpx.URL(url, params=params))
+        cached = self._etags.get(key)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+        r = await self.client.get(url, headers=headers, params=params)
+        if r.status_code == 304 and cached is not None:
+            self._etags.move_to_end(key)
+            return cached[1], cached[2]
+        r.raise_for_status()
+
+        data = r.json()
+        etag = r.headers.get("ETag")
+        if etag:
+            self._etags[key] = (etag, data, r.links)
+            self._etags.move_to_end(key)
+            if len(self._etags) > ETAG_CACHE_SIZE:
+                self._etags.popitem(last=False)
+        return data, r.links
+
+    async def fetch_pr_head_sha(self, owner: str, repo: str, pr_number: int) -> str:
+        """Return the PR's current head commit SHA (changes on every push/force-push)."""
+        url = f"{GITHUB_API}/repos/{owner}/{repo}/pulls/{pr_number}"
+        data, _ = await self._get_json(url, revalidate=True)
+        return data["head"]["sha"]
+
+    async def fetch_pr_files(self, owner: str, repo: str, pr_number: int) -> List[Dict[str, Any]]:
+        url = f"{GITHUB_API}/repos/{owner}/{repo}/pulls/{pr_number}/files"
+
+        # data is a list of files with keys like filename, status, additions, deletions, patch, etc.
+        data, links = await self._get_json(url, params={"per_page": PER_PAGE, "page": 1})
+
+        # The first page's Link header tells us how many pages exist; fetch the rest concurrently.
+        last_url = links.get("last", {}).get("url")
+        if not last_url:
             return data
+        last_page = int(httpx.URL(last_url).params.get("page", "1"))
+        rest = await asyncio.gather(*[
+            self._get_json(url, params={"per_page": PER_PAGE, "page": page})
+            for page in range(2, last_page + 1)
+        ])
+        for page_data, _ in rest:
+            data.extend(page_data)
+        return data
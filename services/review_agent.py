@@ -1,9 +1,38 @@
 import re
+from collections import Counter
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import List, Optional
 
+# Matched from offset 3, i.e. just past the "@@ " the caller has already checked.
+_HUNK_HEADER_RE = re.compile(r"-\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+_DEF_RE = re.compile(r"\s*def\s+\w+\(.*\):\s*$")
+_CLASS_RE = re.compile(r"\s*class\s+\w+\s*\(?\w*\)?:\s*$")
+_TODO_RE = re.compile(r"\b(TODO|FIXME|XXX)\b")
+# Literals every SECRET_PATTERNS hit on an ASCII line must contain; checked with `in` before any regex runs.
+_SECRET_KEYWORDS = ("api_key", "apikey", "secret", "password")
+# No leading \b: a literal-led alternation lets sre skip ahead with its prefix scan, and the
+# left word boundary is checked by hand on the (rare) hits in _count_branch_keywords.
+_COMPLEXITY_KW_RE = re.compile(r"(?:if|for|while|try|with|except|match|case)\b")
 
-@dataclass
+# Style checks share one trigger scan per line: plain literal branches (no capture
+# groups) keep sre's fast prefix search, and the exact patterns below only run on a hit.
+_STYLE_RE = re.compile(r"\t|print\(|\d{3}")
+_PRINT_RE = re.compile(r"\bprint\(")
+_MAGIC_NUM_RE = re.compile(r"\b\d{3,}\b")
+_HEX_OR_CONST_RE = re.compile(r"(0x[0-9a-fA-F]+|[A-Z_]{3,})")
+
+
+def _count_branch_keywords(txt: str) -> int:
+    """Count whole-word branch keywords in `txt` (same result as a \\b...\\b findall)."""
+    count = 0
+    for m in _COMPLEXITY_KW_RE.finditer(txt):
+        start = m.start()
+        if start == 0 or not (txt[start - 1].isalnum() or txt[start - 1] == "_"):
+            count += 1
+    return count
+
+
+@dataclass(slots=True, frozen=True)
 class ReviewFinding:
     file: str
     line: Optional[int]
@@ -12,7 +41,7 @@ class ReviewFinding:
     rule: str      # short rule id (e.g., "complexity", "secrets")
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ReviewResult:
     score: int
     summary: str
@@ -33,27 +62,51 @@ class ReviewEngine:
     ]
 
     INSECURE_PATTERNS = [
-        (re.compile(r"\beval\("), "Avoid eval(): code injection risk."),
-        (re.compile(r"\bexec\("), "Avoid exec(): security & maintainability risk."),
-        (re.compile(r"subprocess\.[A-Za-z_]+\(.*shell\s*=\s*True"), "subprocess with shell=True is dangerous; prefer list args."),
-        (re.compile(r"pickle\.loads\("), "Untrusted pickle.loads can RCE; consider safer formats."),
-        (re.compile(r"requests\.get\(.*verify\s*=\s*False"), "TLS verification disabled; restore verify=True."),
+        ("eval", re.compile(r"\beval\("), "Avoid eval(): code injection risk."),
+        ("exec", re.compile(r"\bexec\("), "Avoid exec(): security & maintainability risk."),
+        ("shell", re.compile(r"subprocess\.[A-Za-z_]+\(.*shell\s*=\s*True"),
+         "subprocess with shell=True is dangerous; prefer list args."),
+        ("pickle", re.compile(r"pickle\.loads\("), "Untrusted pickle.loads can RCE; consider safer formats."),
+        ("verify", re.compile(r"requests\.get\(.*verify\s*=\s*False"),
+         "TLS verification disabled; restore verify=True."),
     ]
 
+    # Literal prefix of every insecure pattern, fused into one alternation so the
+    # common (clean) line is scanned once; full patterns only run for triggers hit.
+    _INSECURE_TRIGGERS = {
+        "eval(": "eval", "exec(": "exec", "subprocess.": "shell", "pickle.loads(": "pickle", "requests.get(": "verify",
+    }
+    _INSECURE_RE = re.compile("|".join(map(re.escape, _INSECURE_TRIGGERS)))
+
     def generate_feedback(self, diff_text: str, file: str) -> List[ReviewFinding]:
-        """Parse a unified diff patch and run heuristics on added lines."""
+        """Parse a unified diff patch and run heuristics on added lines.
+
+        Every per-line check runs inside one pass over each hunk's added lines;
+        complexity is accumulated along the way and judged once per hunk.
+        """
         findings: List[ReviewFinding] = []
         for hunk, _ in self._iter_hunks(diff_text):
-            added_lines: List[Tuple[int, str]] = [
-                (ln, txt) for (op, txt, ln) in hunk if op == "+" and ln is not None
-            ]
+            first_added_line: Optional[int] = None
+            added_ops = 0
+            max_nesting = 0
+            for op, txt, ln in hunk:
+                if op != "+":
+                    continue
+                if first_added_line is None:
+                    first_added_line = ln
+
+                self._check_missing_docstrings(findings, file, ln, txt)
+                self._check_todos(findings, file, ln, txt)
+                self._check_insecure(findings, file, ln, txt)
+                self._check_secrets(findings, file, ln, txt)
+                self._check_style(findings, file, ln, txt)
+
+                added_ops += _count_branch_keywords(txt)
+                level = (len(txt) - len(txt.lstrip(" "))) // 4
+                if level > max_nesting:
+                    max_nesting = level
 
-            findings.extend(self._check_missing_docstrings(file, hunk))
-            findings.extend(self._check_todos(file, added_lines))
-            findings.extend(self._check_insecure(file, added_lines))
-            findings.extend(self._check_secrets(file, added_lines))
-            findings.extend(self._check_style(file, added_lines))
-            findings.extend(self._check_complexity(file, hunk))
+            self._check_complexity(findings, file, first_added_line, added_ops, max_nesting)
 
         return findings
 
@@ -66,10 +119,7 @@ class ReviewEngine:
             "missing-doc": 6, "todo": 2, "no-text-diff": 0
         }
 
-        by_rule = {}
-        for f in findings:
-            by_rule.setdefault(f.rule, 0)
-            by_rule[f.rule] += 1
+        by_rule = Counter(f.rule for f in findings)
 
         for rule, count in by_rule.items():
             p = penalties.get(rule, 3)
@@ -103,118 +153,157 @@ class ReviewEngine:
     # ------------------------ Diff Parsing ------------------------
 
     def _iter_hunks(self, patch: str):
-        """Yield (hunk_lines, start_line_right) for each @@ block."""
-        lines = patch.splitlines()
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            if line.startswith("@@ "):
-                m = re.search(r"@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@", line)
+        """Yield (hunk_lines, start_line_right) for each @@ block.
+
+        Single forward pass; each line is classified by its first character only.
+        Stays on `str`: the patch arrives decoded, and encoding to bytes just to
+        decode every payload again measured slower than 1-char str compares.
+        """
+        hunk = None
+        right_start = right_lineno = 1
+        for line in patch.splitlines():
+            first = line[:1]
+            if first == "@" and line.startswith("@@ "):
+                if hunk is not None:
+                    yield hunk, right_start
+                m = _HUNK_HEADER_RE.match(line, 3)
                 right_start = int(m.group(1)) if m else 1
                 right_lineno = right_start
-                i += 1
                 hunk = [("@", line, None)]
-                while i < len(lines) and not lines[i].startswith("@@ "):
-                    l = lines[i]
-                    if l.startswith("+"):
-                        hunk.append(("+", l[1:], right_lineno))
-                        right_lineno += 1
-                    elif l.startswith("-"):
-                        hunk.append(("-", l[1:], None))
-                    else:
-                        hunk.append((" ", l[1:] if l.startswith(" ") else l, right_lineno))
-                        right_lineno += 1
-                    i += 1
-                yield hunk, right_start
+            elif hunk is None:
+                continue
+            elif first == "+":
+                hunk.append(("+", line[1:], right_lineno))
+                right_lineno += 1
+            elif first == "-":
+                hunk.append(("-", line[1:], None))
             else:
-                i += 1
+                hunk.append((" ", line[1:] if first == " " else line, right_lineno))
+                right_lineno += 1
+        if hunk is not None:
+            yield hunk, right_start
 
     # ------------------------ Heuristics ------------------------
+    # Per-line checks append straight into the caller's findings list.
 
-    def _check_missing_docstrings(self, file: str, hunk) -> List[ReviewFinding]:
-        findings: List[ReviewFinding] = []
-        for op, txt, ln in hunk:
-            if op == "+":
-                if re.match(r"\s*def\s+\w+\(.*\):\s*$", txt) or re.match(r"\s*class\s+\w+\s*\(?\w*\)?:\s*$", txt):
-                    findings.append(
-                        ReviewFinding(
-                            file=file,
-                            line=ln,
-                            feedback="Public defs/classes should start with a docstring.",
-                            severity="info",
-                            rule="missing-doc",
-                        )
-                    )
-        return findings
+    def _check_missing_docstrings(self, out: List[ReviewFinding], file: str, ln: int, txt: str) -> None:
+        # Cheap prefix gate first; the regexes only confirm the signature shape.
+        if not txt.lstrip().startswith(("def", "class")):
+            return
+        if _DEF_RE.match(txt) or _CLASS_RE.match(txt):
+            out.append(
+                ReviewFinding(
+                    file=file,
+                    line=ln,
+                    feedback="Public defs/classes should start with a docstring.",
+                    severity="info",
+                    rule="missing-doc",
+                )
+            )
+
+    def _check_todos(self, out: List[ReviewFinding], file: str, ln: int, txt: str) -> None:
+        if _TODO_RE.search(txt):
+            out.append(
+                ReviewFinding(
+                    file=file,
+                    line=ln,
+                    feedback="Leftover TODO/FIXME found—consider resolving before merge.",
+                    severity="info",
+                    rule="todo",
+                )
+            )
+
+    def _check_insecure(self, out: List[ReviewFinding], file: str, ln: int, txt: str) -> None:
+        hits = self._INSECURE_RE.findall(txt)
+        if not hits:
+            return
+        kinds = {self._INSECURE_TRIGGERS[h] for h in hits}
+        for name, pat, msg in self.INSECURE_PATTERNS:
+            if name in kinds and pat.search(txt):
+                out.append(
+                    ReviewFinding(file=file, line=ln, feedback=msg, severity="error", rule="insecure")
+                )
 
-    def _check_todos(self, file: str, added: List[Tuple[int, str]]) -> List[ReviewFinding]:
-        out: List[ReviewFinding] = []
-        for ln, txt in added:
-            if re.search(r"\b(TODO|FIXME|XXX)\b", txt):
+    def _check_secrets(self, out: List[ReviewFinding], file: str, ln: int, txt: str) -> None:
+        # Nearly every line is clean; plain substring tests rule it out far cheaper than 3 regex scans.
+        # The keyword test is only exact for ASCII text: under re.I, non-ASCII characters such as
+        # "İ", "ı", "ſ" or the Kelvin sign also match keyword letters, so those lines go to the regexes.
+        if "AKIA" not in txt and "-----BEGIN " not in txt and txt.isascii():
+            low = txt.lower()
+            if not any(k in low for k in _SECRET_KEYWORDS):
+                return
+        for pat in self.SECRET_PATTERNS:
+            if pat.search(txt):
                 out.append(
                     ReviewFinding(
                         file=file,
                         line=ln,
-                        feedback="Leftover TODO/FIXME found—consider resolving before merge.",
-                        severity="info",
-                        rule="todo",
+                        feedback="Potential secret detected; remove from code and rotate credentials.",
+                        severity="error",
+                        rule="secrets",
                     )
                 )
-        return out
-
-    def _check_insecure(self, file: str, added: List[Tuple[int, str]]) -> List[ReviewFinding]:
-        out: List[ReviewFinding] = []
-        for ln, txt in added:
-            for pat, msg in self.INSECURE_PATTERNS:
-                if pat.search(txt):
-                    out.append(
-                        ReviewFinding(file=file, line=ln, feedback=msg, severity="error", rule="insecure")
-                    )
-        return out
-
-    def _check_secrets(self, file: str, added: List[Tuple[int, str]]) -> List[ReviewFinding]:
-        out: List[ReviewFinding] = []
-        for ln, txt in added:
-            for pat in self.SECRET_PATTERNS:
-                if pat.search(txt):
-                    out.append(
-                        ReviewFinding(
-                            file=file,
-                            line=ln,
-                            feedback="Potential secret detected; remove from code and rotate credentials.",
-                            severity="error",
-                            rule="secrets",
-                        )
-                    )
-        return out
-
-    def _check_style(self, file: str, added: List[Tuple[int, str]]) -> List[ReviewFinding]:
-        out: List[ReviewFinding] = []
-        for ln, txt in added:
-            if len(txt) > 120:
-                out.append(ReviewFinding(file=file, line=ln, feedback="Line exceeds 120 chars.", severity="warn", rule="style"))
-            if txt.rstrip() != txt:
-                out.append(ReviewFinding(file=file, line=ln, feedback="Trailing whitespace.", severity="info", rule="style"))
-            if "\t" in txt:
-                out.append(ReviewFinding(file=file, line=ln, feedback="Tab character found; prefer spaces.", severity="info", rule="style"))
-            if re.search(r"\bprint\(", txt):
-                out.append(ReviewFinding(file=file, line=ln, feedback="Avoid print() in production; use logging.", severity="info", rule="style"))
-            if re.search(r"\b\d{3,}\b", txt) and not re.search(r"(0x[0-9a-fA-F]+|[A-Z_]{3,})", txt):
-                out.append(ReviewFinding(file=file, line=ln, feedback="Magic number—consider named constant.", severity="info", rule="style"))
-        return out
-
-    def _check_complexity(self, file: str, hunk) -> List[ReviewFinding]:
-        out: List[ReviewFinding] = []
-        added_ops = 0
-        max_nesting = 0
-        for op, txt, ln in hunk:
-            if op == "+":
-                added_ops += len(re.findall(r"\b(if|for|while|try|with|except|match|case)\b", txt))
-                indent = len(txt) - len(txt.lstrip(" "))
-                level = indent // 4
-                max_nesting = max(max_nesting, level)
+
+    def _check_style(self, out: List[ReviewFinding], file: str, ln: int, txt: str) -> None:
+        if len(txt) > 120:
+            out.append(
+                ReviewFinding(
+                    file=file,
+                    line=ln,
+                    feedback="Line exceeds 120 chars.",
+                    severity="warn",
+                    rule="style",
+                )
+            )
+        if txt.rstrip() != txt:
+            out.append(
+                ReviewFinding(
+                    file=file,
+                    line=ln,
+                    feedback="Trailing whitespace.",
+                    severity="info",
+                    rule="style",
+                )
+            )
+        hits = set(_STYLE_RE.findall(txt))
+        if not hits:
+            return
+        if "\t" in hits:
+            out.append(
+                ReviewFinding(
+                    file=file,
+                    line=ln,
+                    feedback="Tab character found; prefer spaces.",
+                    severity="info",
+                    rule="style",
+                )
+            )
+        if "print(" in hits and _PRINT_RE.search(txt):
+            out.append(
+                ReviewFinding(
+                    file=file,
+                    line=ln,
+                    feedback="Avoid print() in production; use logging.",
+                    severity="info",
+                    rule="style",
+                )
+            )
+        if hits - {"\t", "print("} and _MAGIC_NUM_RE.search(txt) and not _HEX_OR_CONST_RE.search(txt):
+            out.append(
+                ReviewFinding(
+                    file=file,
+                    line=ln,
+                    feedback="Magic number—consider named constant.",
+                    severity="info",
+                    rule="style",
+                )
+            )
+
+    def _check_complexity(
+        self, out: List[ReviewFinding], file: str, first_added_line: Optional[int], added_ops: int, max_nesting: int
+    ) -> None:
+        """Judge a whole hunk from the branch-keyword count and deepest indent of its added lines."""
         if added_ops >= 6 or max_nesting >= 3:
-            first_added_line = next((ln for (op, _t, ln) in hunk if op == "+" and ln is not None), None)
             out.append(
                 ReviewFinding(
                     file=file,
@@ -224,4 +313,7 @@ class ReviewEngine:
                     rule="complexity",
                 )
             )
-        return out
+
+
+# The engine only holds compiled patterns, so one shared instance serves every request.
+ENGINE = ReviewEngine()